@@ -3,36 +3,78 @@ Configuration management for the Dynamic Schema Parser.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from src.models import Config, ScrapingConfig, StorageConfig
 
 
+_ENV_KEYS = (
+    "MAX_PAGES",
+    "MAX_DEPTH",
+    "DELAY_BETWEEN_REQUESTS",
+    "TIMEOUT",
+    "USER_AGENT",
+    "OUTPUT_DIR",
+    "CREATE_DIRECTORIES",
+    "PRESERVE_STRUCTURE",
+    "PARALLEL_WORKERS",
+    "LOG_LEVEL",
+)
+
+
 def load_config(config_file: Optional[str] = None) -> Config:
-    """Load configuration from file or environment variables."""
+    """Load configuration from file or environment variables.
+
+    Results are memoized on the config file and the relevant environment
+    values; each call returns a fresh copy, so callers may mutate it freely.
+    Use ``load_config.cache_clear()`` to force the file to be re-read.
+    """
+    env = tuple(os.environ.get(key) for key in _ENV_KEYS)
+    return _copy_config(_load_config_cached(config_file, env))
+
+
+def _copy_config(config: Config) -> Config:
+    """Copy a cached Config deep enough that callers cannot mutate the cache."""
+    copied = config.model_copy()
+    copied.scraping = scraping = config.scraping.model_copy()
+    copied.storage = config.storage.model_copy()
+    scraping.excluded_paths = list(scraping.excluded_paths)
+    if scraping.allowed_domains is not None:
+        scraping.allowed_domains = list(scraping.allowed_domains)
+    return copied
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(config_file: Optional[str], env: Tuple[Optional[str], ...]) -> Config:
+    """Build a Config from the given environment snapshot and config file."""
+    values = dict(zip(_ENV_KEYS, env))
+    
+    def getenv(key: str, default=None):
+        value = values[key]
+        return default if value is None else value
     
     # Default configuration
     config = Config()
     
     # Override with environment variables
-    config.scraping.max_pages = int(os.getenv("MAX_PAGES", config.scraping.max_pages))
-    config.scraping.max_depth = int(os.getenv("MAX_DEPTH", config.scraping.max_depth))
-    config.scraping.delay_between_requests = float(os.getenv("DELAY_BETWEEN_REQUESTS", config.scraping.delay_between_requests))
-    config.scraping.timeout = int(os.getenv("TIMEOUT", config.scraping.timeout))
-    config.scraping.user_agent = os.getenv("USER_AGENT", config.scraping.user_agent)
+    config.scraping.max_pages = int(getenv("MAX_PAGES", config.scraping.max_pages))
+    config.scraping.max_depth = int(getenv("MAX_DEPTH", config.scraping.max_depth))
+    config.scraping.delay_between_requests = float(getenv("DELAY_BETWEEN_REQUESTS", config.scraping.delay_between_requests))
+    config.scraping.timeout = int(getenv("TIMEOUT", config.scraping.timeout))
+    config.scraping.user_agent = getenv("USER_AGENT", config.scraping.user_agent)
     
-    config.storage.output_dir = os.getenv("OUTPUT_DIR", config.storage.output_dir)
-    config.storage.create_directories = os.getenv("CREATE_DIRECTORIES", "true").lower() == "true"
-    config.storage.preserve_structure = os.getenv("PRESERVE_STRUCTURE", "true").lower() == "true"
+    config.storage.output_dir = getenv("OUTPUT_DIR", config.storage.output_dir)
+    config.storage.create_directories = getenv("CREATE_DIRECTORIES", "true").lower() == "true"
+    config.storage.preserve_structure = getenv("PRESERVE_STRUCTURE", "true").lower() == "true"
     
-    config.parallel_workers = int(os.getenv("PARALLEL_WORKERS", config.parallel_workers))
-    config.log_level = os.getenv("LOG_LEVEL", config.log_level)
+    config.parallel_workers = int(getenv("PARALLEL_WORKERS", config.parallel_workers))
+    config.log_level = getenv("LOG_LEVEL", config.log_level)
     
     # Load from config file if provided
     if config_file and os.path.exists(config_file):
         import json
-        with open(config_file, 'r') as f:
-            file_config = json.load(f)
+        file_config = json.loads(Path(config_file).read_bytes())
             
         if 'scraping' in file_config:
             for key, value in file_config['scraping'].items():
@@ -47,6 +89,9 @@ def load_config(config_file: Optional[str] = None) -> Config:
     return config
 
 
+load_config.cache_clear = _load_config_cached.cache_clear
+
+
 def get_schema_org_cache_path() -> Path:
     """Get the path for caching schema.org definitions."""
     cache_dir = Path.home() / ".dynamic_schema" / "cache"
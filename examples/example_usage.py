@@ -31,28 +31,29 @@ async def example_basic_usage():
     print("Starting website crawl...")
     
     # Process each page
-    async for page in crawler.iter_pages():
-        print(f"Processing: {page.url}")
+    async with crawler:
+        async for page in crawler.iter_pages():
+            print(f"Processing: {page.url}")
         
-        # Extract or generate JSON-LD
-        jsonld_objects = await ai_parser.extract_or_generate_jsonld(
-            page_url=page.url,
-            html=page.raw_html or "",
-            title=page.page_title,
-        )
+            # Extract or generate JSON-LD
+            jsonld_objects = await ai_parser.extract_or_generate_jsonld(
+                page_url=page.url,
+                html=page.raw_html or "",
+                title=page.page_title,
+            )
         
-        # Validate and save each JSON-LD object
-        for i, jsonld_obj in enumerate(jsonld_objects):
-            # Validate against schema.org
-            errors = validator.validate_jsonld(jsonld_obj)
-            if errors:
-                print(f"  Validation errors: {errors}")
-            else:
-                print(f"  Valid JSON-LD generated")
+            # Validate and save each JSON-LD object
+            for i, jsonld_obj in enumerate(jsonld_objects):
+                # Validate against schema.org
+                errors = validator.validate_jsonld(jsonld_obj)
+                if errors:
+                    print(f"  Validation errors: {errors}")
+                else:
+                    print(f"  Valid JSON-LD generated")
             
-            # Save to file
-            file_path = storage.save_jsonld_for_url(page.url, jsonld_obj)
-            print(f"  Saved to: {file_path}")
+                # Save to file
+                file_path = storage.save_jsonld_for_url(page.url, jsonld_obj)
+                print(f"  Saved to: {file_path}")
 
 
 async def example_with_custom_config():
@@ -72,23 +73,24 @@ async def example_with_custom_config():
     print("Crawling Hacker News...")
     
     page_count = 0
-    async for page in crawler.iter_pages():
-        page_count += 1
-        print(f"Page {page_count}: {page.url}")
+    async with crawler:
+        async for page in crawler.iter_pages():
+            page_count += 1
+            print(f"Page {page_count}: {page.url}")
         
-        # Generate schema
-        jsonld_objects = await ai_parser.extract_or_generate_jsonld(
-            page_url=page.url,
-            html=page.raw_html or "",
-            title=page.page_title,
-        )
+            # Generate schema
+            jsonld_objects = await ai_parser.extract_or_generate_jsonld(
+                page_url=page.url,
+                html=page.raw_html or "",
+                title=page.page_title,
+            )
         
-        # Save each schema
-        for jsonld_obj in jsonld_objects:
-            storage.save_jsonld_for_url(page.url, jsonld_obj)
+            # Save each schema
+            for jsonld_obj in jsonld_objects:
+                storage.save_jsonld_for_url(page.url, jsonld_obj)
         
-        if page_count >= 5:  # Limit for example
-            break
+            if page_count >= 5:  # Limit for example
+                break
 
 
 def example_validation():
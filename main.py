@@ -6,6 +6,7 @@ from urllib.parse import urlparse
 import click
 
 from config.settings import load_config, get_log_config
+from src.models import PageSchema
 from src.scraper import WebsiteCrawler
 from src.schema_parser import SchemaAIParser
 from src.storage import SchemaStorage
@@ -33,22 +34,49 @@ def cli(url: str, output: str, max_pages: int | None, max_depth: int | None, con
     if not parsed.scheme or not parsed.netloc:
         raise click.ClickException("Invalid URL provided.")
 
-    crawler = WebsiteCrawler(base_url=url, config=config)
+    try:
+        crawler = WebsiteCrawler(base_url=url, config=config)
+    except ValueError as exc:  # e.g. a non-http(s) scheme
+        raise click.ClickException(str(exc)) from exc
     storage = SchemaStorage(config.storage)
-    ai_parser = SchemaAIParser()
+    ai_parser = SchemaAIParser(max_concurrency=config.parallel_workers)
+    workers = max(1, config.parallel_workers)
 
-    async def run() -> None:
-        async for page in crawler.iter_pages():
+    async def process(page: PageSchema) -> None:
+        try:
+            jsonld_objects = await ai_parser.extract_or_generate_jsonld(
+                page_url=page.url,
+                html=page.raw_html or "",
+                title=page.page_title,
+            )
+            for obj in jsonld_objects:
+                storage.save_jsonld_for_url_str(page.url, obj)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Failed processing %s: %s", page.url, exc)
+
+    async def worker(queue: asyncio.Queue[PageSchema]) -> None:
+        while True:
+            page = await queue.get()
             try:
-                jsonld_objects = await ai_parser.extract_or_generate_jsonld(
-                    page_url=page.url,
-                    html=page.raw_html or "",
-                    title=page.page_title,
-                )
-                for obj in jsonld_objects:
-                    storage.save_jsonld_for_url(page.url, obj)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Failed processing %s: %s", page.url, exc)
+                await process(page)
+            finally:
+                queue.task_done()
+
+    async def run() -> None:
+        # Pages are processed by a pool of workers while the crawl continues;
+        # the bounded queue keeps the crawler from running far ahead of them.
+        queue: asyncio.Queue[PageSchema] = asyncio.Queue(maxsize=workers * 2)
+        tasks = [asyncio.create_task(worker(queue)) for _ in range(workers)]
+        try:
+            async with crawler:
+                async for page in crawler.iter_pages():
+                    await queue.put(page)
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await ai_parser.aclose()
+            storage.close()
 
     asyncio.run(run())
 
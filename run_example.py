@@ -54,42 +54,43 @@ async def run_example():
     schema_count = 0
     
     try:
-        async for page in crawler.iter_pages():
-            page_count += 1
-            print(f"📄 Page {page_count}: {page.url}")
-            print(f"   Title: {page.page_title}")
+        async with crawler:
+            async for page in crawler.iter_pages():
+                page_count += 1
+                print(f"📄 Page {page_count}: {page.url}")
+                print(f"   Title: {page.page_title}")
             
-            # Extract or generate JSON-LD
-            jsonld_objects = await ai_parser.extract_or_generate_jsonld(
-                page_url=page.url,
-                html=page.raw_html or "",
-                title=page.page_title,
-            )
+                # Extract or generate JSON-LD
+                jsonld_objects = await ai_parser.extract_or_generate_jsonld(
+                    page_url=page.url,
+                    html=page.raw_html or "",
+                    title=page.page_title,
+                )
             
-            if jsonld_objects:
-                print(f"   📋 Found {len(jsonld_objects)} schema(s)")
+                if jsonld_objects:
+                    print(f"   📋 Found {len(jsonld_objects)} schema(s)")
                 
-                # Process each JSON-LD object
-                for i, jsonld_obj in enumerate(jsonld_objects):
-                    schema_count += 1
+                    # Process each JSON-LD object
+                    for i, jsonld_obj in enumerate(jsonld_objects):
+                        schema_count += 1
                     
-                    # Validate
-                    errors = validator.validate_jsonld(jsonld_obj)
-                    if errors:
-                        print(f"   ⚠️  Schema {i+1} validation errors: {len(errors)}")
-                    else:
-                        print(f"   ✅ Schema {i+1} is valid")
+                        # Validate
+                        errors = validator.validate_jsonld(jsonld_obj)
+                        if errors:
+                            print(f"   ⚠️  Schema {i+1} validation errors: {len(errors)}")
+                        else:
+                            print(f"   ✅ Schema {i+1} is valid")
                     
-                    # Save to file
-                    file_path = storage.save_jsonld_for_url(page.url, jsonld_obj)
-                    print(f"   💾 Saved to: {file_path}")
-            else:
-                print("   ❌ No schemas found/generated")
+                        # Save to file
+                        file_path = storage.save_jsonld_for_url(page.url, jsonld_obj)
+                        print(f"   💾 Saved to: {file_path}")
+                else:
+                    print("   ❌ No schemas found/generated")
             
-            print()
+                print()
             
-            if page_count >= config.scraping.max_pages:
-                break
+                if page_count >= config.scraping.max_pages:
+                    break
     
     except KeyboardInterrupt:
         print("\n⏹️  Crawling interrupted by user")
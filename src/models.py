@@ -2,10 +2,12 @@
 Data models and schemas for the Dynamic Schema Parser.
 """
 
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from datetime import datetime
 import json
+import zlib
 
 
 class SchemaProperty(BaseModel):
@@ -18,32 +20,49 @@ class SchemaProperty(BaseModel):
     properties: Optional[Dict[str, 'SchemaProperty']] = None
 
 
-class SchemaDefinition(BaseModel):
+@dataclass(slots=True)
+class SchemaDefinition:
     """Represents a complete schema definition."""
     id: str
     name: str
     type: str
     description: Optional[str] = None
-    properties: Dict[str, SchemaProperty] = Field(default_factory=dict)
+    properties: Dict[str, SchemaProperty] = field(default_factory=dict)
     extends: Optional[str] = None
     context: str = "https://schema.org"
-    source_url: Optional[HttpUrl] = None
-    created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
+    source_url: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
 
 
-class PageSchema(BaseModel):
+@dataclass(slots=True)
+class PageSchema:
     """Represents schemas found on a specific page."""
-    url: HttpUrl
+    url: str
     page_title: str
-    schemas: List[SchemaDefinition] = Field(default_factory=list)
-    raw_html: Optional[str] = None
-    extracted_at: datetime = Field(default_factory=datetime.now)
-    errors: List[str] = Field(default_factory=list)
+    schemas: List[SchemaDefinition] = field(default_factory=list)
+    # zlib-compressed UTF-8; read it back via ``raw_html``
+    compressed_html: Optional[bytes] = field(default=None, repr=False)
+    extracted_at: datetime = field(default_factory=datetime.now)
+    errors: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_html(cls, url: str, page_title: str, html: str, **kwargs: Any) -> "PageSchema":
+        """Build a page, compressing its HTML for storage."""
+        return cls(url=url, page_title=page_title, compressed_html=zlib.compress(html.encode("utf-8"), 1), **kwargs)
+
+    @property
+    def raw_html(self) -> Optional[str]:
+        """The page HTML, decompressed on access."""
+        if self.compressed_html is None:
+            return None
+        return zlib.decompress(self.compressed_html).decode("utf-8")
 
 
 class WebsiteSchema(BaseModel):
     """Represents all schemas for an entire website."""
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
     domain: str
     base_url: HttpUrl
     pages: List[PageSchema] = Field(default_factory=list)
@@ -76,6 +95,9 @@ class StorageConfig(BaseModel):
     include_metadata: bool = True
     compression: bool = False
     format: str = "json"  # json, yaml, xml
+    aggregate: bool = False  # append to JSONL shards instead of one file per URL
+    shard_bytes: int = 2 * 1024 * 1024 * 1024
+    direct_io: bool = False  # O_DIRECT for large files, where supported
 
 
 class Config(BaseModel):
@@ -1,18 +1,75 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Any, List
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
+import xxhash
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # pragma: no cover - regex fallback below
+    HTMLParser = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+_JSONLD_SELECTOR = 'script[type="application/ld+json"]'
+_JSONLD_RE = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.S | re.I,
+)
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Template-heavy sites serve many identical bodies; remember their scripts
+_SCRIPT_CACHE_SIZE = 512
+_script_cache: OrderedDict[int, Tuple[str, ...]] = OrderedDict()
+
+
+def _iter_jsonld_scripts(html: str) -> Iterator[str]:
+    """Yield the bodies of JSON-LD script tags without building a full DOM."""
+    if HTMLParser is not None:
+        for script in HTMLParser(html).css(_JSONLD_SELECTOR):
+            yield script.text()
+    else:
+        for match in _JSONLD_RE.finditer(html):
+            yield match.group(1)
+
+
+def _jsonld_script_bodies(html: str) -> Tuple[str, ...]:
+    """JSON-LD script bodies of a page, memoized on a hash of its HTML."""
+    key = xxhash.xxh64_intdigest(html.encode("utf-8", "surrogatepass"))
+    bodies = _script_cache.get(key)
+    if bodies is None:
+        bodies = tuple(_iter_jsonld_scripts(html))
+        _script_cache[key] = bodies
+        if len(_script_cache) > _SCRIPT_CACHE_SIZE:
+            _script_cache.popitem(last=False)
+    else:
+        _script_cache.move_to_end(key)
+    return bodies
 
 
 def _extract_embedded_jsonld(html: str) -> List[dict[str, Any]]:
-    soup = BeautifulSoup(html, "lxml")
+    # Most pages carry no JSON-LD at all; skip any parsing for them
+    if "application/ld+json" not in html:
+        return []
+
+    # Bodies are decoded on every call so callers never share result dicts
     results: List[dict[str, Any]] = []
-    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+    for body in _jsonld_script_bodies(html):
         try:
-            data = json.loads(script.string or "{}")
+            data = _json_loads(body or "{}")
             if isinstance(data, list):
                 results.extend([obj for obj in data if isinstance(obj, dict)])
             elif isinstance(data, dict):
@@ -22,6 +79,29 @@ def _extract_embedded_jsonld(html: str) -> List[dict[str, Any]]:
     return results
 
 
+def _summarize_html(html: str, max_chars: int = 16_000) -> str:
+    """Reduce a page to its title, description, headings and body text, bounded in size."""
+    if HTMLParser is None:
+        return html[:max_chars]
+
+    tree = HTMLParser(html)
+    tree.strip_tags(["script", "style", "noscript", "template"])
+    parts: List[str] = []
+    title_el = tree.css_first("title")
+    if title_el is not None:
+        parts.append(f"Title: {title_el.text(strip=True)}")
+    meta_el = tree.css_first('meta[name="description"]')
+    if meta_el is not None and meta_el.attributes.get("content"):
+        parts.append(f"Description: {meta_el.attributes['content']}")
+    for heading in tree.css("h1, h2, h3"):
+        text = heading.text(strip=True)
+        if text:
+            parts.append(f"{heading.tag.upper()}: {text}")
+    if tree.body is not None:
+        parts.append("Body: " + " ".join(tree.body.text(separator=" ").split()))
+    return "\n".join(parts)[:max_chars]
+
+
 _SYSTEM_PROMPT = (
     "You are a web semantics expert. Given an HTML page, produce a valid JSON-LD "
     "object using schema.org vocabulary that best represents the primary content. "
@@ -31,19 +111,36 @@ _SYSTEM_PROMPT = (
 
 
 class SchemaAIParser:
-    def __init__(self) -> None:
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
         self._provider = os.getenv("AI_PROVIDER", "openai").lower()
         self._model = os.getenv("AI_MODEL", "gpt-4o-mini")
+        # Caps in-flight AI requests when pages are processed concurrently
+        self._ai_semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # Created on first use and shared, so requests reuse one connection pool
+        self._client: Optional[AsyncOpenAI] = None
 
-    async def _ai_generate(self, page_url: str, html: str, title: str) -> List[dict[str, Any]]:
-        # Lazy import so that dependency is optional
-        from openai import AsyncOpenAI  # type: ignore
+    def _get_client(self) -> AsyncOpenAI:
+        if self._client is None:
+            # Imported lazily: openai is optional and slow to import
+            try:
+                from openai import AsyncOpenAI
+            except ImportError as exc:  # pragma: no cover - AI generation is optional
+                raise RuntimeError("The 'openai' package is required for AI generation") from exc
+            self._client = AsyncOpenAI()
+        return self._client
 
-        client = AsyncOpenAI()
+    async def aclose(self) -> None:
+        """Close the shared AI client, if one was created."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _ai_generate(self, page_url: str, html: str, title: str) -> List[dict[str, Any]]:
+        client = self._get_client()
         prompt = (
             f"URL: {page_url}\n"
             f"Title: {title}\n"
-            "HTML (truncated to relevant parts may be okay):\n\n" + html
+            "Page content (summarized from the HTML):\n\n" + _summarize_html(html)
         )
         resp = await client.chat.completions.create(
             model=self._model,
@@ -72,7 +169,10 @@ class SchemaAIParser:
 
         # Fallback to AI generation if no embedded JSON-LD exists
         try:
-            return await self._ai_generate(page_url=page_url, html=html, title=title)
+            if self._ai_semaphore is None:
+                return await self._ai_generate(page_url=page_url, html=html, title=title)
+            async with self._ai_semaphore:
+                return await self._ai_generate(page_url=page_url, html=html, title=title)
         except Exception:
             return []
 
@@ -4,8 +4,10 @@ Schema.org validation and integration functionality.
 
 import json
 import logging
+import mmap
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, FrozenSet, List, Any, Optional, Union
 from urllib.parse import urljoin
 
 import requests
@@ -13,23 +15,81 @@ from jsonschema import validate, ValidationError, Draft7Validator
 
 from config.settings import get_schema_org_cache_path
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_SCHEMA_ORG_PREFIX = "https://schema.org/"
+_MISSING = object()
+
+
+def _json_loads(data: Union[bytes, memoryview]) -> Any:
+    """Decode JSON bytes, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data if isinstance(data, bytes) else bytes(data))
+
+
+def _load_json_file(path: Path) -> Any:
+    """Decode a JSON file straight from a read-only memory map."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return _json_loads(view)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode compact JSON bytes, preferring orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 
 class SchemaOrgValidator:
     """Validates JSON-LD against schema.org definitions."""
     
     def __init__(self):
         self.schema_cache_path = get_schema_org_cache_path()
-        self.schema_definitions: Dict[str, Any] = {}
-        self._load_schema_definitions()
+        self._definitions: Optional[Dict[str, Any]] = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._valid_types: FrozenSet[str] = frozenset()
+        # Per-instance so cached validators never outlive their definitions
+        self._type_validator = lru_cache(maxsize=256)(self._make_type_validator)
+    
+    @property
+    def schema_definitions(self) -> Dict[str, Any]:
+        """Schema.org definitions, loaded on first access."""
+        return self._ensure_loaded()
+    
+    def _ensure_loaded(self) -> Dict[str, Any]:
+        """Load the definitions if this is the first call that needs them."""
+        if self._definitions is None:
+            self._load_schema_definitions()
+            self._build_index()
+        return self._definitions
+    
+    def _build_index(self) -> None:
+        """Index rdfs:Class nodes by @id in a single pass over @graph."""
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for item in self._definitions.get("@graph", []):
+            if item.get("@type") == "rdfs:Class":
+                type_id = item.get("@id", "")
+                by_id.setdefault(type_id, item)
+        
+        self._by_id = by_id
+        self._valid_types = frozenset(
+            type_id[len(_SCHEMA_ORG_PREFIX):]
+            for type_id in by_id
+            if isinstance(type_id, str) and type_id.startswith(_SCHEMA_ORG_PREFIX)
+        )
     
     def _load_schema_definitions(self) -> None:
         """Load schema.org definitions from cache or fetch from source."""
         if self.schema_cache_path.exists():
             try:
-                with open(self.schema_cache_path, 'r', encoding='utf-8') as f:
-                    self.schema_definitions = json.load(f)
+                self._definitions = _load_json_file(self.schema_cache_path)
                 logger.info("Loaded schema.org definitions from cache")
                 return
             except Exception as e:
@@ -45,17 +105,16 @@ class SchemaOrgValidator:
             response = requests.get(url, timeout=30)
             response.raise_for_status()
             
-            self.schema_definitions = response.json()
+            self._definitions = _json_loads(response.content)
             
-            # Cache the definitions
+            # Cache the definitions (compact; the file is never read by hand)
             self.schema_cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.schema_cache_path, 'w', encoding='utf-8') as f:
-                json.dump(self.schema_definitions, f, indent=2)
+            self.schema_cache_path.write_bytes(_json_dumps(self._definitions))
             
             logger.info("Fetched and cached latest schema.org definitions")
         except Exception as e:
             logger.error(f"Failed to fetch schema.org definitions: {e}")
-            self.schema_definitions = {}
+            self._definitions = {}
     
     def validate_jsonld(self, jsonld_data: Dict[str, Any]) -> List[str]:
         """
@@ -67,58 +126,62 @@ class SchemaOrgValidator:
         Returns:
             List of validation errors (empty if valid)
         """
-        errors = []
-        
         if not isinstance(jsonld_data, dict):
-            errors.append("JSON-LD data must be a dictionary")
-            return errors
+            return ["JSON-LD data must be a dictionary"]
         
-        # Check for required @context
-        if "@context" not in jsonld_data:
-            errors.append("Missing required @context field")
-        elif jsonld_data["@context"] != "https://schema.org":
-            errors.append("@context must be 'https://schema.org'")
-        
-        # Check for @type
-        if "@type" not in jsonld_data:
-            errors.append("Missing required @type field")
+        type_name = jsonld_data.get("@type", _MISSING)
+        if type_name is _MISSING or isinstance(type_name, str):
+            validator = self._type_validator(type_name)
         else:
-            type_name = jsonld_data["@type"]
-            if not self._is_valid_schema_type(type_name):
-                errors.append(f"Unknown schema.org type: {type_name}")
-        
-        # Validate properties if schema definition exists
-        if "@type" in jsonld_data and not errors:
-            type_name = jsonld_data["@type"]
+            validator = self._make_type_validator(type_name)  # unhashable, e.g. a list
+        return validator(jsonld_data)
+    
+    def _make_type_validator(self, type_name: Any) -> Callable[[Dict[str, Any]], List[str]]:
+        """Specialize validation for one @type, resolving the type lookups once."""
+        schema_def = None
+        if type_name is _MISSING:
+            type_error = "Missing required @type field"
+        elif self._is_valid_schema_type(type_name):
+            type_error = None
             schema_def = self._get_schema_definition(type_name)
-            if schema_def:
-                property_errors = self._validate_properties(jsonld_data, schema_def)
-                errors.extend(property_errors)
+        else:
+            type_error = f"Unknown schema.org type: {type_name}"
+        validate_properties = self._validate_properties
         
-        return errors
+        def check(jsonld_data: Dict[str, Any]) -> List[str]:
+            errors = []
+            
+            # Check for required @context
+            context = jsonld_data.get("@context", _MISSING)
+            if context is _MISSING:
+                errors.append("Missing required @context field")
+            elif context != "https://schema.org":
+                errors.append("@context must be 'https://schema.org'")
+            
+            if type_error is not None:
+                errors.append(type_error)
+            
+            # Validate properties if schema definition exists
+            if schema_def and not errors:
+                errors.extend(validate_properties(jsonld_data, schema_def))
+            
+            return errors
+        
+        return check
     
     def _is_valid_schema_type(self, type_name: str) -> bool:
         """Check if a type name is valid in schema.org."""
         if not self.schema_definitions:
             return True  # Can't validate without definitions
         
-        # Look for the type in the schema definitions
-        for item in self.schema_definitions.get("@graph", []):
-            if item.get("@type") == "rdfs:Class" and item.get("@id") == f"https://schema.org/{type_name}":
-                return True
-        
-        return False
+        return isinstance(type_name, str) and type_name in self._valid_types
     
     def _get_schema_definition(self, type_name: str) -> Optional[Dict[str, Any]]:
         """Get schema definition for a specific type."""
         if not self.schema_definitions:
             return None
         
-        for item in self.schema_definitions.get("@graph", []):
-            if item.get("@type") == "rdfs:Class" and item.get("@id") == f"https://schema.org/{type_name}":
-                return item
-        
-        return None
+        return self._by_id.get(f"{_SCHEMA_ORG_PREFIX}{type_name}")
     
     def _validate_properties(self, jsonld_data: Dict[str, Any], schema_def: Dict[str, Any]) -> List[str]:
         """Validate properties against schema definition."""
@@ -149,14 +212,7 @@ class SchemaOrgValidator:
         if not self.schema_definitions:
             return []
         
-        types = []
-        for item in self.schema_definitions.get("@graph", []):
-            if item.get("@type") == "rdfs:Class":
-                type_id = item.get("@id", "")
-                if type_id.startswith("https://schema.org/"):
-                    types.append(type_id.replace("https://schema.org/", ""))
-        
-        return sorted(types)
+        return sorted(self._valid_types)
     
     def get_type_properties(self, type_name: str) -> List[str]:
         """Get properties available for a specific schema type."""
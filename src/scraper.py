@@ -1,20 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import re
-from collections import deque
 from dataclasses import dataclass
 from typing import AsyncGenerator, Iterable
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
+import xxhash
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 
 from src.models import PageSchema, ScrapingConfig, Config
 
 
 _LINK_SELECTOR = "a[href]"
 _ALLOWED_SCHEMES = {"http", "https"}
+# Typical tracking query params
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid"})
 
 
 @dataclass(slots=True)
@@ -22,13 +24,44 @@ class CrawledPage:
     url: str
     page_title: str
     raw_html: str
+    tree: HTMLParser
 
 
 class WebsiteCrawler:
     def __init__(self, base_url: str, config: Config) -> None:
         self.base_url = base_url.rstrip("/")
         self.config: ScrapingConfig = config.scraping
+        self.parallel_workers = max(1, config.parallel_workers)
         self._parsed_base = urlparse(self.base_url)
+        # Validated once here; pages carry plain str URLs from then on
+        if self._parsed_base.scheme not in _ALLOWED_SCHEMES or not self._parsed_base.netloc:
+            raise ValueError(f"Invalid base URL: {base_url!r}")
+        self._session: aiohttp.ClientSession | None = None
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        headers = {"User-Agent": self.config.user_agent}
+        connector = aiohttp.TCPConnector(
+            limit_per_host=8, use_dns_cache=True, ttl_dns_cache=300, keepalive_timeout=30
+        )
+        return aiohttp.ClientSession(headers=headers, connector=connector)
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the shared HTTP session; repeated crawls reuse its connection pool."""
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> WebsiteCrawler:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
 
     def _is_same_domain(self, url: str) -> bool:
         parsed = urlparse(url)
@@ -36,10 +69,22 @@ class WebsiteCrawler:
 
     def _normalize(self, url: str) -> str:
         url = url.split("#", 1)[0]
-        # Remove typical tracking query params
-        url = re.sub(r"([?&])(utm_[^=&]+|fbclid|gclid)=[^&]*", r"\\1", url)
-        url = re.sub(r"[?&]+$", "", url)
-        return url
+        # Most links have no query string; only those need filtering
+        if "?" not in url:
+            return url
+
+        # Drop tracking params and empty segments, leaving every other segment
+        # byte-for-byte as the server sent it
+        base, _, query = url.partition("?")
+        segments = query.split("&")
+        kept = []
+        for seg in segments:
+            key = seg.partition("=")[0]
+            if seg and not (key.startswith(_TRACKING_PREFIXES) or key in _TRACKING_PARAMS):
+                kept.append(seg)
+        if len(kept) == len(segments):
+            return url
+        return f"{base}?{'&'.join(kept)}" if kept else base
 
     async def _fetch(self, session: aiohttp.ClientSession, url: str) -> CrawledPage | None:
         try:
@@ -50,15 +95,15 @@ class WebsiteCrawler:
         except Exception:  # noqa: BLE001
             return None
 
-        soup = BeautifulSoup(html, "lxml")
-        title_el = soup.find("title")
-        title = title_el.text.strip() if title_el else url
-        return CrawledPage(url=url, page_title=title, raw_html=str(soup))
+        # Parse once; the tree is reused for link extraction
+        tree = HTMLParser(html)
+        title_el = tree.css_first("title")
+        title = title_el.text(strip=True) if title_el else url
+        return CrawledPage(url=url, page_title=title, raw_html=html, tree=tree)
 
-    def _extract_links(self, html: str, base_url: str) -> Iterable[str]:
-        soup = BeautifulSoup(html, "lxml")
-        for a in soup.select(_LINK_SELECTOR):
-            href = a.get("href")
+    def _extract_links(self, tree: HTMLParser, base_url: str) -> Iterable[str]:
+        for a in tree.css(_LINK_SELECTOR):
+            href = a.attributes.get("href")
             if not href:
                 continue
             absolute = urljoin(base_url, href)
@@ -66,31 +111,61 @@ class WebsiteCrawler:
             if self._is_same_domain(absolute):
                 yield absolute
 
-    async def iter_pages(self) -> AsyncGenerator[PageSchema, None]:
-        visited: set[str] = set()
-        queue: deque[tuple[str, int]] = deque([(self.base_url, 0)])
-
-        headers = {"User-Agent": self.config.user_agent}
-        connector = aiohttp.TCPConnector(limit_per_host=8)
-        async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
-            while queue and len(visited) < self.config.max_pages:
-                url, depth = queue.popleft()
-                if url in visited or depth > self.config.max_depth:
-                    continue
-
-                visited.add(url)
-                page = await self._fetch(session, url)
-                if page is None:
-                    continue
-
-                yield PageSchema(url=url, page_title=page.page_title, raw_html=page.raw_html)
-
-                if depth < self.config.max_depth:
-                    for link in self._extract_links(page.raw_html, url):
-                        if link not in visited:
-                            queue.append((link, depth + 1))
-
-                if self.config.delay_between_requests > 0:
-                    await asyncio.sleep(self.config.delay_between_requests)
-
+    async def _fetch_limited(
+        self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str
+    ) -> CrawledPage | None:
+        # Each worker paces itself, so the delay bounds the per-worker request rate
+        async with semaphore:
+            page = await self._fetch(session, url)
+            if self.config.delay_between_requests > 0:
+                await asyncio.sleep(self.config.delay_between_requests)
+            return page
 
+    async def iter_pages(self) -> AsyncGenerator[PageSchema, None]:
+        # Breadth-first by depth: every URL of a wave is fetched concurrently and
+        # pages are yielded as they complete, feeding the next wave's frontier.
+        frontier: list[str] = [self.base_url] if self.config.max_pages > 0 else []
+        # 64-bit URL hashes rather than the URL strings keep crawl state small
+        visited: set[int] = {xxhash.xxh64_intdigest(url.encode()) for url in frontier}
+        semaphore = asyncio.Semaphore(self.parallel_workers)
+
+        # Without an explicit start()/async with, the session lives for this crawl
+        # only; it is kept local so concurrent crawls can't close each other's
+        owns_session = self._session is None or self._session.closed
+        session = self._new_session() if owns_session else self._session
+        try:
+            depth = 0
+            while frontier and depth <= self.config.max_depth:
+                next_frontier: list[str] = []
+                pending = {
+                    asyncio.create_task(self._fetch_limited(session, semaphore, url))
+                    for url in frontier
+                }
+                try:
+                    while pending:
+                        # Finished tasks are dropped as soon as they are consumed, so a
+                        # page's parsed tree and HTML don't outlive its processing.
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            page = task.result()
+                            if page is None:
+                                continue
+
+                            yield PageSchema.from_html(page.url, page.page_title, page.raw_html)
+
+                            if depth < self.config.max_depth:
+                                for link in self._extract_links(page.tree, page.url):
+                                    link_hash = xxhash.xxh64_intdigest(link.encode())
+                                    if link_hash not in visited and len(visited) < self.config.max_pages:
+                                        visited.add(link_hash)
+                                        next_frontier.append(link)
+                finally:
+                    # The consumer may stop early; don't leave fetches running
+                    for task in pending:
+                        task.cancel()
+
+                frontier = next_frontier
+                depth += 1
+        finally:
+            if owns_session:
+                await session.close()
@@ -1,41 +1,323 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import mmap
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import ClassVar, Iterable, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from src.models import StorageConfig
 from pydantic import HttpUrl
 
+# Fastest available encoder: orjson, then ujson (for platforms without orjson
+# wheels), then the stdlib
+try:
+    import orjson
+    _FAST = "orjson"
+except ImportError:  # pragma: no cover - fallbacks below
+    orjson = None
+    try:
+        import ujson
+        _FAST = "ujson"
+    except ImportError:
+        ujson = None
+        _FAST = "stdlib"
+
+
+# Fast path for the http(s) URLs the crawler produces; anything else, including
+# URLs with the \t\r\n characters urlparse strips, goes through urlparse
+_URL_RE = re.compile(r"^https?://([^/?#\t\r\n]+)([^?#;\t\r\n]*)(?:[?#]|$)")
+_INDEX_FILE = "index.jsonl"
+# O_DIRECT only pays off for large write-once files
+_DIRECT_IO_MIN_BYTES = 64 * 1024
+_DIRECT_IO_BLOCK = 4096
+_SHARD_GLOB = "schemas-*.jsonl"
+_PATH_CACHE_SIZE = 100_000
+
+
+def _encode(data: dict) -> bytes:
+    # Compact output; use SchemaStorage.read_pretty to inspect a file by hand
+    if _FAST == "orjson":
+        # orjson always emits UTF-8, matching ensure_ascii=False
+        return orjson.dumps(data)
+    if _FAST == "ujson":
+        return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_line(data: dict) -> bytes:
+    return _encode(data) + b"\n"
+
+
+def _coerce_url(page_url: Union[str, HttpUrl]) -> str:
+    """URL as a str; str input, the common case, is returned without a call."""
+    if isinstance(page_url, str):
+        return page_url
+    return str(page_url)
+
+
+def _key_for_url(url_str: str) -> bytes:
+    """Stable 16-byte key for a URL, for hash-keyed lookup and dedup across shards."""
+    return hashlib.sha1(url_str.encode("utf-8")).digest()[:16]
+
+
+def _write_all(fd: int, payload: bytes) -> None:
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_direct(path: str, payload: bytes) -> None:
+    """Write payload with O_DIRECT, bypassing the page cache."""
+    size = -(-len(payload) // _DIRECT_IO_BLOCK) * _DIRECT_IO_BLOCK
+    # Anonymous maps are page-aligned, as O_DIRECT requires
+    with mmap.mmap(-1, size) as buf:
+        buf.write(payload)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+        try:
+            with memoryview(buf) as view:
+                if os.write(fd, view) != size:
+                    raise OSError("short O_DIRECT write")
+            # Trim the block padding
+            os.ftruncate(fd, len(payload))
+        finally:
+            os.close(fd)
+
 
 class SchemaStorage:
+    # Output dirs already created in this process, shared by all instances
+    _mkdir_done: ClassVar[set[str]] = set()
+
     def __init__(self, config: StorageConfig) -> None:
         self.config = config
-        Path(self.config.output_dir).mkdir(parents=True, exist_ok=True)
+        self._base = Path(self.config.output_dir)
+        self._base_str = os.fspath(self.config.output_dir)
+        if self._base_str not in SchemaStorage._mkdir_done:
+            self._base.mkdir(parents=True, exist_ok=True)
+            SchemaStorage._mkdir_done.add(self._base_str)
+        # Directories already created by this instance, so siblings skip the mkdir
+        self._mkdir_cache: set[str] = set()
+        # Re-saved URLs (refresh passes) skip path derivation and mkdir entirely
+        self._path_cache: dict[str, Path] = {}
+        # Aggregate mode state: the open shard and index, created on first write
+        self._shard_fd: Optional[int] = None
+        self._shard_id = 0
+        self._shard_size = 0
+        self._index_fd: Optional[int] = None
+        # url -> (shard, offset, length), built from index.jsonl and extended
+        # with whatever has been appended since the last lookup
+        self._index_rows: dict[str, Tuple[int, int, int]] = {}
+        self._index_read_pos = 0
+
+    @staticmethod
+    @lru_cache(maxsize=16384)
+    def _compute_relative(url_str: str) -> str:
+        """Schema file path for a URL, relative to the output dir."""
+        match = _URL_RE.match(url_str)
+        if match is not None:
+            domain, path = match.group(1), match.group(2)
+        else:
+            parsed = urlparse(url_str)
+            domain = parsed.netloc
+            path = parsed.path
+        segments = list(filter(None, path.split("/")))
+        if not segments:
+            return os.path.join(domain, "index", "schema.json")
+        # If last segment has extension, strip it (everything from the first dot)
+        last = segments[-1].partition(".")[0]
+        return os.path.join(domain, *segments[:-1], last, "schema.json")
 
     def _path_for_url(self, page_url: Union[str, HttpUrl]) -> Path:
         # Convert HttpUrl to string if needed
-        url_str = str(page_url)
-        parsed = urlparse(url_str)
-        domain = parsed.netloc
-        path = parsed.path
-        segments = [seg for seg in path.split("/") if seg]
-        base = Path(self.config.output_dir) / domain
-        if not segments:
-            return base / "index" / "schema.json"
-        last = segments[-1]
-        # If last segment has extension, strip it
-        if "." in last:
-            last = last.split(".", 1)[0]
-        dir_path = base.joinpath(*segments[:-1], last)
-        return dir_path / "schema.json"
+        return self._path_for_url_str(_coerce_url(page_url))
+
+    def _path_for_url_str(self, url_str: str) -> Path:
+        # The relative path is cached whole, so a repeat URL costs one join
+        return Path(os.path.join(self._base_str, self._compute_relative(url_str)))
+
+    def _shard_path(self, shard_id: int) -> Path:
+        return self._base / f"schemas-{shard_id:05d}.jsonl"
+
+    def _open_shard(self, shard_id: int) -> None:
+        if self._shard_fd is not None:
+            os.close(self._shard_fd)
+        self._shard_id = shard_id
+        self._shard_fd = os.open(self._shard_path(shard_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._shard_size = os.fstat(self._shard_fd).st_size
+
+    def _append(self, url_str: str, data: dict) -> Path:
+        """Append one document to the current shard and record it in the index."""
+        if self._shard_fd is None:
+            # The class-level mkdir cache may predate removal of the output dir
+            self._base.mkdir(parents=True, exist_ok=True)
+            # Resume after the newest existing shard
+            existing = sorted(self._base.glob(_SHARD_GLOB))
+            self._open_shard(int(existing[-1].stem.split("-", 1)[1]) if existing else 0)
+            index_path = self._base / _INDEX_FILE
+            self._index_fd = os.open(index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        payload = _encode_line(data)
+        if self._shard_size and self._shard_size + len(payload) > self.config.shard_bytes:
+            self._open_shard(self._shard_id + 1)
+
+        # O_APPEND places each write at the real end of file, so derive the
+        # offset from the fd rather than our own count, which goes stale when
+        # another writer appends to the same shard.
+        written = os.write(self._shard_fd, payload)
+        end = os.lseek(self._shard_fd, 0, os.SEEK_CUR)
+        offset = end - written
+        if written < len(payload):
+            _write_all(self._shard_fd, payload[written:])
+            end = os.lseek(self._shard_fd, 0, os.SEEK_CUR)
+        self._shard_size = end
+        row = {
+            "url": url_str,
+            "key": _key_for_url(url_str).hex(),
+            "shard": self._shard_id,
+            "offset": offset,
+            "length": len(payload) - 1,
+        }
+        _write_all(self._index_fd, _encode_line(row))
+        return self._shard_path(self._shard_id)
+
+    def _refresh_index(self) -> dict[str, Tuple[int, int, int]]:
+        """Fold rows appended to index.jsonl since the last call into the lookup table."""
+        index_path = self._base / _INDEX_FILE
+        try:
+            f = index_path.open("rb")
+        except FileNotFoundError:
+            self._index_rows.clear()
+            self._index_read_pos = 0
+            return self._index_rows
+        with f:
+            if os.fstat(f.fileno()).st_size < self._index_read_pos:
+                # The index was replaced or truncated; start over
+                self._index_rows.clear()
+                self._index_read_pos = 0
+            f.seek(self._index_read_pos)
+            chunk = f.read()
+        # A concurrent writer may be mid-row; leave a partial last line for next time
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            row = json.loads(line)
+            self._index_rows[row["url"]] = (row["shard"], row["offset"], row["length"])
+        self._index_read_pos += end
+        return self._index_rows
+
+    def _ensure_parent(self, target: Path) -> None:
+        parent = target.parent
+        key = str(parent)
+        if key not in self._mkdir_cache:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._mkdir_cache.add(key)
+
+    def _write(self, target: Path, payload: bytes) -> None:
+        # Write to a temp file and rename it over the target, so a crash never
+        # leaves a truncated schema.json behind
+        tmp = f"{target}.tmp{os.getpid()}.{threading.get_ident()}"
+        if self.config.direct_io and len(payload) >= _DIRECT_IO_MIN_BYTES and hasattr(os, "O_DIRECT"):
+            try:
+                _write_direct(tmp, payload)
+            except OSError:
+                pass  # e.g. tmpfs rejects O_DIRECT; use the buffered path below
+            else:
+                os.replace(tmp, target)
+                return
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _write_all(fd, payload)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp)
+            raise
+        os.close(fd)
+        os.replace(tmp, target)
 
     def save_jsonld_for_url(self, page_url: Union[str, HttpUrl], data: dict) -> Path:
-        target = self._path_for_url(page_url)
-        target.parent.mkdir(parents=True, exist_ok=True)
-        with target.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        return self.save_jsonld_for_url_str(_coerce_url(page_url), data)
+
+    def save_jsonld_for_url_str(self, url_str: str, data: dict) -> Path:
+        """Same as save_jsonld_for_url, for callers that already hold a str URL."""
+        if self.config.aggregate:
+            return self._append(url_str, data)
+        target = self._path_cache.get(url_str)
+        if target is None:
+            target = self._path_for_url_str(url_str)
+            self._ensure_parent(target)
+            # Cached only once its directory exists; evict oldest-first
+            if len(self._path_cache) >= _PATH_CACHE_SIZE:
+                del self._path_cache[next(iter(self._path_cache))]
+            self._path_cache[url_str] = target
+        self._write(target, _encode(data))
         return target
 
+    def save_many(self, items: Iterable[Tuple[Union[str, HttpUrl], dict]]) -> List[Path]:
+        """Save several JSON-LD documents, returning their paths in input order."""
+        if self.config.aggregate:
+            return [self._append(_coerce_url(page_url), data) for page_url, data in items]
+
+        # Resolve and encode everything before touching the filesystem
+        batch = [(self._path_for_url(page_url), _encode(data)) for page_url, data in items]
+        for target, payload in batch:
+            self._ensure_parent(target)
+            self._write(target, payload)
+        return [target for target, _ in batch]
+
+    def save_many_threaded(
+        self, items: Iterable[Tuple[Union[str, HttpUrl], dict]], workers: int = 8
+    ) -> List[Path]:
+        """Like save_many, but overlaps the file writes on a thread pool."""
+        if self.config.aggregate:
+            # Shards are append-only with a single writer
+            return self.save_many(items)
+
+        # Encoding and mkdir stay on this thread; workers only write
+        batch = [(self._path_for_url(page_url), _encode(data)) for page_url, data in items]
+        # One write per target, keeping the last payload as save_many does, so
+        # repeated URLs don't race each other to the final rename
+        latest = dict(batch)
+        for target in latest:
+            self._ensure_parent(target)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda job: self._write(*job), latest.items()))
+        return [target for target, _ in batch]
+
+    @staticmethod
+    def key_for_url(page_url: Union[str, HttpUrl]) -> bytes:
+        """Canonical storage key for a URL, as recorded in the aggregate index."""
+        return _key_for_url(_coerce_url(page_url))
+
+    @staticmethod
+    def read_pretty(path: Union[str, Path]) -> str:
+        """Return a saved schema file re-indented for human inspection."""
+        return json.dumps(json.loads(Path(path).read_bytes()), ensure_ascii=False, indent=2)
+
+    def load_jsonld_for_url(self, page_url: Union[str, HttpUrl]) -> Optional[dict]:
+        """Read back the most recently saved document for a URL, if any."""
+        url_str = _coerce_url(page_url)
+        if not self.config.aggregate:
+            target = self._path_for_url(url_str)
+            if not target.exists():
+                return None
+            return json.loads(target.read_bytes())
+
+        location = self._refresh_index().get(url_str)
+        if location is None:
+            return None
+        shard, offset, length = location
+        with self._shard_path(shard).open("rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
 
+    def close(self) -> None:
+        """Close any open aggregate shard and index files."""
+        for fd in (self._shard_fd, self._index_fd):
+            if fd is not None:
+                os.close(fd)
+        self._shard_fd = self._index_fd = None
@@ -5,10 +5,12 @@ Tests for the Dynamic Schema Parser.
 import pytest
 import json
 from unittest.mock import Mock, patch, AsyncMock
-from src.schema_parser import SchemaAIParser, _extract_embedded_jsonld
+from src.schema_parser import SchemaAIParser, _extract_embedded_jsonld, _summarize_html
 from src.schema_validator import SchemaOrgValidator
-from src.storage import SchemaStorage
-from src.models import StorageConfig
+from src.storage import SchemaStorage, _encode
+from src.models import Config, PageSchema, StorageConfig, WebsiteSchema
+from src.scraper import WebsiteCrawler
+from config.settings import _load_config_cached, load_config
 
 
 class TestSchemaParser:
@@ -71,13 +73,84 @@ class TestSchemaParser:
         result = _extract_embedded_jsonld(html_with_invalid)
         assert len(result) == 0
     
+    def test_extract_embedded_jsonld_regex_fallback(self):
+        """Test extraction without selectolax installed."""
+        html = """
+        <html>
+        <head>
+            <SCRIPT data-x="1" type='application/ld+json'>
+            [{"@context": "https://schema.org", "@type": "Person", "name": "Jane"}, "skip"]
+            </SCRIPT>
+        </head>
+        </html>
+        """
+        
+        with patch('src.schema_parser.HTMLParser', None):
+            result = _extract_embedded_jsonld(html)
+        assert len(result) == 1
+        assert result[0]["name"] == "Jane"
+    
+    def test_extract_embedded_jsonld_cached(self):
+        """Test repeat pages hit the script cache but get fresh dicts."""
+        from src import schema_parser
+        
+        html = '<script type="application/ld+json">{"@type": "Article", "headline": "Cached"}</script>'
+        
+        first = _extract_embedded_jsonld(html)
+        cache_size = len(schema_parser._script_cache)
+        second = _extract_embedded_jsonld(html)
+        
+        assert first == second == [{"@type": "Article", "headline": "Cached"}]
+        assert first[0] is not second[0]
+        assert len(schema_parser._script_cache) == cache_size
+    
+    def test_summarize_html(self):
+        """Test the AI prompt summary keeps page text and drops scripts."""
+        html = """
+        <html>
+        <head>
+            <title>Widget Co</title>
+            <meta name="description" content="Widgets for everyone">
+            <style>body { color: red; }</style>
+        </head>
+        <body>
+            <h1>Widgets</h1><h2>Blue</h2><h3>Small</h3><h4>Skipped</h4>
+            <script>var tracking = 1;</script>
+            <p>Buy   our
+            widgets.</p>
+        </body>
+        </html>
+        """
+        
+        summary = _summarize_html(html)
+        assert summary.splitlines()[:5] == [
+            "Title: Widget Co",
+            "Description: Widgets for everyone",
+            "H1: Widgets",
+            "H2: Blue",
+            "H3: Small",
+        ]
+        assert "Buy our widgets." in summary
+        assert "H4:" not in summary
+        assert "tracking" not in summary and "color" not in summary
+        
+        assert _summarize_html(html, max_chars=20) == summary[:20]
+    
+    def test_summarize_html_without_selectolax(self):
+        """Test the summary falls back to truncated raw HTML."""
+        html = "<html><body>" + "x" * 100 + "</body></html>"
+        
+        with patch("src.schema_parser.HTMLParser", None):
+            assert _summarize_html(html, max_chars=30) == html[:30]
+            assert _summarize_html(html) == html
+    
     @pytest.mark.asyncio
     async def test_ai_generate_fallback(self):
         """Test AI generation when no embedded JSON-LD exists."""
         parser = SchemaAIParser()
         
         # Mock the AI client
-        with patch('src.schema_parser.AsyncOpenAI') as mock_openai:
+        with patch('openai.AsyncOpenAI') as mock_openai:
             mock_client = AsyncMock()
             mock_openai.return_value = mock_client
             
@@ -95,6 +168,9 @@ class TestSchemaParser:
             assert len(result) == 1
             assert result[0]["@type"] == "Article"
             assert result[0]["headline"] == "AI Generated"
+            
+            prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+            assert _summarize_html("<html><body>Content</body></html>") in prompt
 
 
 class TestSchemaValidator:
@@ -151,12 +227,156 @@ class TestSchemaValidator:
         assert "@context must be 'https://schema.org'" in errors
 
 
+class TestModels:
+    """Test cases for the data models."""
+    
+    def test_website_schema_json_round_trip(self):
+        """Test compressed page HTML survives a JSON round trip."""
+        html = "<html><head><title>Test</title></head><body>Hello</body></html>"
+        website = WebsiteSchema(
+            domain="example.com",
+            base_url="https://example.com",
+            pages=[PageSchema.from_html("https://example.com/", "Test", html)]
+        )
+        
+        restored = WebsiteSchema.model_validate_json(website.model_dump_json())
+        assert restored.pages[0].raw_html == html
+
+
+class TestConfig:
+    """Test cases for configuration loading."""
+    
+    def test_load_config_cached(self, monkeypatch):
+        """Test repeated loads hit the cache but return independent copies."""
+        load_config.cache_clear()
+        monkeypatch.setenv("MAX_PAGES", "7")
+        
+        first = load_config()
+        first.scraping.max_pages = 99
+        first.scraping.excluded_paths.append("/private")
+        first.storage.output_dir = "elsewhere"
+        second = load_config()
+        
+        assert second is not first
+        assert second.scraping.max_pages == 7
+        assert "/private" not in second.scraping.excluded_paths
+        assert second.storage.output_dir != "elsewhere"
+        assert _load_config_cached.cache_info().hits == 1
+    
+    def test_load_config_cache_clear(self, tmp_path):
+        """Test cache_clear forces the config file to be re-read."""
+        load_config.cache_clear()
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"scraping": {"max_depth": 1}}))
+        assert load_config(str(config_file)).scraping.max_depth == 1
+        
+        config_file.write_text(json.dumps({"scraping": {"max_depth": 2}}))
+        assert load_config(str(config_file)).scraping.max_depth == 1
+        
+        load_config.cache_clear()
+        assert load_config(str(config_file)).scraping.max_depth == 2
+
+
+class TestScraper:
+    """Test cases for crawler helpers."""
+    
+    def test_normalize_strips_tracking_params(self):
+        """Test removal of tracking params and fragments."""
+        crawler = WebsiteCrawler("https://example.com", Config())
+        
+        assert crawler._normalize("https://example.com/a?utm_source=x") == "https://example.com/a"
+        assert crawler._normalize("https://example.com/a?id=1&gclid=abc#top") == "https://example.com/a?id=1"
+        assert crawler._normalize("https://example.com/a?id=1") == "https://example.com/a?id=1"
+        assert crawler._normalize("https://example.com/a?x=1&utm_medium=y&b=") == "https://example.com/a?x=1&b="
+        assert crawler._normalize("https://example.com/a?") == "https://example.com/a"
+        
+        # Queries without tracking params pass through untouched
+        for url in (
+            "https://example.com/a?flag",
+            "https://example.com/a?a=1;b=2",
+            "https://example.com/a?q=%ZZ",
+            "https://example.com/a?q=a%20b",
+        ):
+            assert crawler._normalize(url) == url
+        assert crawler._normalize("https://example.com/a?flag&utm_source=x&q=a%20b") == "https://example.com/a?flag&q=a%20b"
+
+
+    @pytest.mark.asyncio
+    async def test_iter_pages_dedups_links(self):
+        """Test the crawl visits each linked page once."""
+        from src.scraper import CrawledPage, HTMLParser
+        
+        config = Config()
+        config.scraping.delay_between_requests = 0
+        site = {
+            "https://example.com": '<a href="/a">A</a><a href="/b">B</a>',
+            "https://example.com/a": '<a href="/b">B</a><a href="/a#top">A</a>',
+            "https://example.com/b": '<a href="/a?utm_source=x">A</a>',
+        }
+        
+        async def fake_fetch(session, url):
+            html = site.get(url)
+            if html is None:
+                return None
+            return CrawledPage(url=url, page_title=url, raw_html=html, tree=HTMLParser(html))
+        
+        crawler = WebsiteCrawler("https://example.com", config)
+        with patch.object(crawler, "_fetch", side_effect=fake_fetch):
+            urls = [page.url async for page in crawler.iter_pages()]
+        
+        assert sorted(urls) == ["https://example.com", "https://example.com/a", "https://example.com/b"]
+    
+    @pytest.mark.asyncio
+    async def test_iter_pages_session_lifecycle(self):
+        """Test per-crawl sessions are private and the shared one is reused."""
+        import asyncio
+        from src.scraper import CrawledPage, HTMLParser
+        
+        config = Config()
+        config.scraping.delay_between_requests = 0
+        site = {
+            "https://example.com": '<a href="/a">A</a><a href="/b">B</a><a href="/c">C</a>',
+            "https://example.com/a": "",
+            "https://example.com/b": "",
+            "https://example.com/c": "",
+        }
+        sessions = []
+        
+        async def fake_fetch(session, url):
+            assert not session.closed
+            sessions.append(session)
+            await asyncio.sleep(0)
+            html = site[url]
+            return CrawledPage(url=url, page_title=url, raw_html=html, tree=HTMLParser(html))
+        
+        async def crawl():
+            return [page.url async for page in crawler.iter_pages()]
+        
+        crawler = WebsiteCrawler("https://example.com", config)
+        with patch.object(crawler, "_fetch", side_effect=fake_fetch):
+            # Two concurrent crawls without start() each get their own session
+            first, second = await asyncio.gather(crawl(), crawl())
+            assert len(first) == len(second) == len(site)
+            assert len(set(sessions)) == 2
+            assert all(session.closed for session in sessions)
+            assert crawler._session is None
+            
+            # Inside async with, crawls share the crawler's session and leave it open
+            sessions.clear()
+            async with crawler:
+                await crawl()
+                await crawl()
+                assert set(sessions) == {crawler._session}
+                assert not crawler._session.closed
+            assert crawler._session is None
+
+
 class TestStorage:
     """Test cases for storage functionality."""
     
-    def test_path_generation(self):
+    def test_path_generation(self, tmp_path):
         """Test path generation for different URLs."""
-        config = StorageConfig(output_dir="./test_schemas")
+        config = StorageConfig(output_dir=str(tmp_path))
         storage = SchemaStorage(config)
         
         # Test root URL
@@ -170,30 +390,137 @@ class TestStorage:
         # Test URL with file extension
         path = storage._path_for_url("https://example.com/page.html")
         assert str(path).endswith("example.com/page/schema.json")
+        
+        # Test URL with whitespace that urlparse strips
+        path = storage._path_for_url("https://example.com/blog/\tpost\n")
+        assert str(path).endswith("example.com/blog/post/schema.json")
     
-    def test_save_jsonld(self):
+    def test_save_jsonld(self, tmp_path):
         """Test saving JSON-LD to file."""
-        import tempfile
-        import os
+        config = StorageConfig(output_dir=str(tmp_path))
+        storage = SchemaStorage(config)
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = StorageConfig(output_dir=temp_dir)
-            storage = SchemaStorage(config)
-            
-            test_data = {
-                "@context": "https://schema.org",
-                "@type": "Article",
-                "headline": "Test Article"
-            }
-            
-            file_path = storage.save_jsonld_for_url("https://example.com/test", test_data)
-            
-            assert os.path.exists(file_path)
-            
-            with open(file_path, 'r') as f:
-                saved_data = json.load(f)
-            
-            assert saved_data == test_data
+        test_data = {
+            "@context": "https://schema.org",
+            "@type": "Article",
+            "headline": "Test Article"
+        }
+        
+        file_path = storage.save_jsonld_for_url("https://example.com/test", test_data)
+        
+        assert file_path.exists()
+        
+        with open(file_path, 'r') as f:
+            saved_data = json.load(f)
+        
+        assert saved_data == test_data
+        assert json.loads(storage.read_pretty(file_path)) == test_data
+    
+    def test_save_jsonld_direct_io(self, tmp_path):
+        """Test large documents written with O_DIRECT are trimmed to size."""
+        config = StorageConfig(output_dir=str(tmp_path), direct_io=True)
+        storage = SchemaStorage(config)
+        
+        # Large enough for the O_DIRECT path, not a multiple of the block size
+        test_data = {"@type": "Article", "articleBody": "x" * 80_000}
+        file_path = storage.save_jsonld_for_url("https://example.com/long", test_data)
+        
+        with open(file_path, 'r') as f:
+            assert json.load(f) == test_data
+        assert file_path.stat().st_size == len(_encode(test_data))
+    
+    def test_save_many(self, tmp_path):
+        """Test saving a batch of JSON-LD documents."""
+        storage = SchemaStorage(StorageConfig(output_dir=str(tmp_path)))
+        
+        items = [
+            ("https://example.com/blog/a", {"@type": "Article", "headline": "A"}),
+            ("https://example.com/blog/b", {"@type": "Article", "headline": "B"}),
+        ]
+        
+        for paths in (storage.save_many(items), storage.save_many_threaded(items, workers=2)):
+            assert len(paths) == 2
+            for path, (_, data) in zip(paths, items):
+                with open(path, 'r') as f:
+                    assert json.load(f) == data
+    
+    def test_save_many_threaded_keeps_last_duplicate(self, tmp_path):
+        """Test a URL repeated in a threaded batch keeps its last payload."""
+        storage = SchemaStorage(StorageConfig(output_dir=str(tmp_path)))
+        items = [("https://example.com/dup", {"n": n}) for n in range(50)]
+        
+        with patch.object(storage, "_write", wraps=storage._write) as write:
+            paths = storage.save_many_threaded(items, workers=8)
+        
+        assert len(paths) == 50 and len(set(paths)) == 1
+        assert write.call_count == 1
+        with open(paths[0], 'r') as f:
+            assert json.load(f) == {"n": 49}
+    
+    def test_save_jsonld_aggregate(self, tmp_path):
+        """Test aggregated JSONL shards with index-based reads."""
+        config = StorageConfig(output_dir=str(tmp_path), aggregate=True, shard_bytes=64)
+        storage = SchemaStorage(config)
+        
+        first = storage.save_jsonld_for_url("https://example.com/a", {"@type": "Article", "headline": "A"})
+        second = storage.save_jsonld_for_url("https://example.com/b", {"@type": "Article", "headline": "B"})
+        storage.save_jsonld_for_url("https://example.com/a", {"@type": "Article", "headline": "A2"})
+        storage.close()
+        
+        assert first != second  # rotated to a new shard
+        assert storage.load_jsonld_for_url("https://example.com/a")["headline"] == "A2"
+        assert storage.load_jsonld_for_url("https://example.com/b")["headline"] == "B"
+        assert storage.load_jsonld_for_url("https://example.com/missing") is None
+        
+        with open(tmp_path / "index.jsonl", 'r') as f:
+            row = json.loads(f.readline())
+        assert bytes.fromhex(row["key"]) == SchemaStorage.key_for_url("https://example.com/a")
+    
+    def test_load_jsonld_aggregate_reads_index_incrementally(self, tmp_path):
+        """Test lookups only parse index rows appended since the last lookup."""
+        config = StorageConfig(output_dir=str(tmp_path), aggregate=True)
+        reader = SchemaStorage(config)
+        writer = SchemaStorage(config)
+        
+        assert reader.load_jsonld_for_url("https://example.com/a") is None
+        writer.save_jsonld_for_url("https://example.com/a", {"headline": "A"})
+        assert reader.load_jsonld_for_url("https://example.com/a") == {"headline": "A"}
+        
+        writer.save_jsonld_for_url("https://example.com/b", {"headline": "B"})
+        writer.save_jsonld_for_url("https://example.com/a", {"headline": "A2"})
+        with patch("src.storage.json.loads", wraps=json.loads) as loads:
+            assert reader.load_jsonld_for_url("https://example.com/a") == {"headline": "A2"}
+        # Two new index rows plus the document itself
+        assert loads.call_count == 3
+        assert reader.load_jsonld_for_url("https://example.com/b") == {"headline": "B"}
+        writer.close()
+    
+    def test_save_jsonld_aggregate_recreates_output_dir(self, tmp_path):
+        """Test aggregate mode recreates an output dir removed after first use."""
+        config = StorageConfig(output_dir=str(tmp_path / "out"), aggregate=True)
+        SchemaStorage(config).close()
+        (tmp_path / "out").rmdir()
+        
+        storage = SchemaStorage(config)
+        storage.save_jsonld_for_url("https://example.com/a", {"@type": "Article", "headline": "A"})
+        storage.close()
+        assert storage.load_jsonld_for_url("https://example.com/a")["headline"] == "A"
+    
+    def test_save_jsonld_aggregate_two_writers(self, tmp_path):
+        """Test index offsets stay correct when two writers share a shard."""
+        config = StorageConfig(output_dir=str(tmp_path), aggregate=True)
+        writer_a = SchemaStorage(config)
+        writer_b = SchemaStorage(config)
+        
+        writer_a.save_jsonld_for_url("https://example.com/1", {"@type": "Article", "headline": "1"})
+        writer_b.save_jsonld_for_url("https://example.com/2", {"@type": "Article", "headline": "2"})
+        writer_a.save_jsonld_for_url("https://example.com/3", {"@type": "Article", "headline": "3"})
+        writer_a.close()
+        writer_b.close()
+        
+        reader = SchemaStorage(config)
+        for n in ("1", "2", "3"):
+            assert reader.load_jsonld_for_url(f"https://example.com/{n}")["headline"] == n
 
 
 if __name__ == "__main__":